@@ -1,18 +1,34 @@
 import streamlit as st
 import json
-import time
+import atexit
 import random
 from pathlib import Path
-from gtts import gTTS
 import io
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional, Tuple, Any
+from dataclasses import dataclass, asdict, field
+from typing import List, Dict, Optional, Tuple, Any, Iterator
 import hashlib
 from datetime import datetime, timedelta
 import pandas as pd
 import os
-import glob
 import uuid
+import math
+import logging
+import threading
+import sqlite3
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
 
 # ============================================================================
 # SIMPLIFIED CONFIGURATION
@@ -32,7 +48,11 @@ class AppConfig:
             "audio": {
                 "cache_ttl_days": 7,
                 "slow_speed": True,
-                "default_language": "en"
+                "default_language": "en",
+                "prefetch_workers": 8
+            },
+            "ui": {
+                "words_per_page": 40
             }
         }
     
@@ -48,10 +68,78 @@ class AppConfig:
 
 config = AppConfig()
 
+# st.fragment (Streamlit >= 1.37) reruns only the decorated function on its own
+# widget interactions; older versions simply run it as part of the full script.
+fragment = getattr(st, "fragment", None) or (lambda func: func)
+# st.segmented_control (Streamlit >= 1.40) falls back to a horizontal radio with nothing selected
+segmented_control = getattr(st, "segmented_control", None) or (
+    lambda label, options, **kwargs: st.radio(label, options, index=None, horizontal=True, **kwargs)
+)
+
+def read_json(path) -> Any:
+    data = Path(path).read_bytes()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def dump_json(obj: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
 # ============================================================================
 # DATA MODELS
 # ============================================================================
-@dataclass
+@lru_cache(maxsize=4096)
+def _flashcard_html(english: str, image_hint: str) -> str:
+    return f"""
+    <div class="flashcard">
+        <h1 style="font-size: 4rem;">{english}</h1>
+        <h2 style="font-size: 3rem;">{image_hint}</h2>
+    </div>
+    """
+
+@lru_cache(maxsize=4096)
+def _flashcard_answer_html(hindi: str, phonetic: str, category: str) -> str:
+    return f"""
+    <div style="background: white; padding: 30px; border-radius: 15px; margin: 20px 0; text-align: center;">
+        <h2 style="color: #ff6b6b; font-size: 3rem;">{hindi}</h2>
+        <p style="font-size: 1.5rem; color: #666;">{phonetic}</p>
+        <p style="font-size: 1.2rem; color: #888;">Category: {category}</p>
+    </div>
+    """
+
+@lru_cache(maxsize=4096)
+def _word_details_html(english: str, hindi: str, phonetic: str, image_hint: str, mnemonic: str) -> str:
+    return f"""
+    <div class="word-details">
+        <div style="font-size: 3rem;">{image_hint} {english}</div>
+        <div style="font-size: 2.5rem;">{hindi}</div>
+        <div style="font-size: 1.5rem;">[{phonetic}]</div>
+    </div>
+    <div class="mnemonic-box"><strong>💡 Memory Tip:</strong> {mnemonic}</div>
+    """
+
+@lru_cache(maxsize=128)
+def _mastery_bar_html(percent: int) -> str:
+    return f"""
+    <p><strong>Mastery:</strong> {percent}%</p>
+    <div class="progress-bar">
+        <div class="progress-fill" style="width: {percent}%">
+            {percent}%
+        </div>
+    </div>
+    """
+
+@lru_cache(maxsize=4096)
+def review_due_at(last_reviewed: str, review_count: int) -> datetime:
+    if review_count == 0:
+        interval = 1
+    elif review_count == 1:
+        interval = 2
+    else:
+        interval = min(int(review_count ** 1.3), 365)
+    return datetime.fromisoformat(last_reviewed) + timedelta(days=interval)
+
+@dataclass(slots=True, eq=False)
 class WordData:
     english: str
     hindi: str
@@ -62,21 +150,47 @@ class WordData:
     mnemonic: str
     image_hint: str
     mastery_level: float = 0.0
-    last_reviewed: Optional[datetime] = None
+    # ISO timestamp string, so saving never needs a datetime fallback
+    last_reviewed: Optional[str] = None
     review_count: int = 0
+    # Display strings derived from the fields above; not persisted
+    display_word: str = field(init=False, repr=False, compare=False)
+    button_label: str = field(init=False, repr=False, compare=False)
+    button_help: str = field(init=False, repr=False, compare=False)
+    english_lc: str = field(init=False, repr=False, compare=False)
+    hindi_lc: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.display_word = self.english.strip() or "❓"
+        self.english_lc = self.english.lower()
+        self.hindi_lc = self.hindi.lower()
+        self.refresh_labels()
+
+    def refresh_labels(self):
+        self.button_label = f"{self.get_mastery_badge()} {self.display_word}"
+        self.button_help = f"{self.hindi} - {int(self.mastery_level * 100)}% mastered"
+
+    def progress_row(self) -> Tuple[str, float, Optional[str], int]:
+        return (self.english, self.mastery_level, self.last_reviewed, self.review_count)
+
+    def is_due(self, now: datetime) -> bool:
+        return not self.last_reviewed or now >= review_due_at(self.last_reviewed, self.review_count)
 
     @property
-    def needs_review(self) -> bool:
-        if not self.last_reviewed:
-            return True
-        days_since = (datetime.now() - self.last_reviewed).days
-        if self.review_count == 0:
-            interval = 1
-        elif self.review_count == 1:
-            interval = 2
-        else:
-            interval = min(int(self.review_count ** 1.3), 365)
-        return days_since >= interval
+    def flashcard_html(self) -> str:
+        return _flashcard_html(self.english, self.image_hint)
+
+    @property
+    def flashcard_answer_html(self) -> str:
+        return _flashcard_answer_html(self.hindi, self.phonetic, self.category)
+
+    @property
+    def details_html(self) -> str:
+        return _word_details_html(self.english, self.hindi, self.phonetic, self.image_hint, self.mnemonic)
+
+    @property
+    def mastery_bar_html(self) -> str:
+        return _mastery_bar_html(int(self.mastery_level * 100))
 
     def get_mastery_badge(self) -> str:
         if self.mastery_level >= 0.9:
@@ -90,7 +204,7 @@ class WordData:
         else:
             return "🔴"
 
-@dataclass
+@dataclass(slots=True)
 class UserProfile:
     name: str
     total_words_learned: int = 0
@@ -117,134 +231,259 @@ class UserProfile:
 # ============================================================================
 # STORAGE MANAGER
 # ============================================================================
+PROGRESS_LOAD_ERRORS = (json.JSONDecodeError, KeyError, TypeError) + ((ijson.JSONError,) if ijson else ())
+
 class LearningStorage:
     def __init__(self):
         self.data_dir = Path("learning_data")
         self.data_dir.mkdir(exist_ok=True)
+        self._last_hash: Optional[bytes] = None
+        # Every write and database call runs on this one thread, so they never interleave.
+        # Created here, not lazily: this object is shared by every session's script thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        atexit.register(self._executor.shutdown, wait=True)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._saved_rows: Dict[str, Tuple] = {}
+        self._pending_rows: Dict[str, Tuple] = {}
+        self._pending_lock = threading.Lock()
+        self._pending_flush: Optional[Future] = None
+
+    def _submit(self, fn, *args) -> Future:
+        return self._executor.submit(fn, *args)
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.data_dir / "progress.db", isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS words (english TEXT PRIMARY KEY, mastery_level REAL, last_reviewed TEXT, review_count INTEGER)")
+            self._conn = conn
+            self._saved_rows = {row[0]: row[1:] for row in conn.execute("SELECT * FROM words")}
+            if not self._saved_rows:
+                self._upsert_words(self._read_legacy_words())
+        return self._conn
+
+    def _read_legacy_words(self) -> List[Tuple]:
+        # Older versions kept every word inside progress.json
+        try:
+            words = read_json(self.data_dir / "progress.json").get("words", [])
+            return [(w["english"], w.get("mastery_level", 0.0), w.get("last_reviewed"), w.get("review_count", 0)) for w in words]
+        except FileNotFoundError:
+            return []
+        except PROGRESS_LOAD_ERRORS as e:
+            logger.warning("Legacy word import failed: %s", e)
+            return []
+
+    def _upsert_words(self, rows: List[Tuple]):
+        db = self._db()
+        rows = [row for row in rows if self._saved_rows.get(row[0]) != row[1:]]
+        if not rows:
+            return
+        db.execute("BEGIN")
+        try:
+            db.executemany("INSERT OR REPLACE INTO words VALUES (?, ?, ?, ?)", rows)
+            db.execute("COMMIT")
+        except Exception:
+            # Leave the connection usable for the next save
+            db.execute("ROLLBACK")
+            raise
+        self._saved_rows.update((row[0], row[1:]) for row in rows)
 
     def save_progress(self, profile: UserProfile, words: List[WordData]):
-        progress = {
-            "profile": profile.to_dict(),
-            "words": [asdict(word) for word in words],
-            "timestamp": datetime.now().isoformat()
-        }
-        with open(self.data_dir / "progress.json", "w", encoding="utf-8") as f:
-            json.dump(progress, f, indent=2, default=str)
+        self.save_async(profile, words).result()
+
+    def save_async(self, profile: UserProfile, words: List[WordData]) -> Future:
+        # Snapshot on the caller's thread so later edits to the words don't race the write
+        progress = {"profile": profile.to_dict()}
+        rows = [word.progress_row() for word in words]
+        return self._submit(self._write_progress, progress, rows)
 
-    def load_progress(self) -> Tuple[Optional[UserProfile], List[WordData]]:
+    def update_word(self, word: WordData) -> Future:
+        # Rapid ratings are coalesced: rows queue up until the one pending flush runs
+        row = word.progress_row()
+        with self._pending_lock:
+            self._pending_rows[row[0]] = row
+            if self._pending_flush is None:
+                self._pending_flush = self._submit(self._flush_pending_rows)
+                # Nobody waits on this future, so failures would otherwise vanish
+                self._pending_flush.add_done_callback(self._log_save_failure)
+            return self._pending_flush
+
+    @staticmethod
+    def _log_save_failure(future: Future):
+        error = future.exception()
+        if error is not None:
+            logger.error("Saving word progress failed", exc_info=error)
+
+    def _flush_pending_rows(self):
+        with self._pending_lock:
+            rows = list(self._pending_rows.values())
+            self._pending_rows.clear()
+            self._pending_flush = None
+        self._upsert_words(rows)
+
+    def _write_progress(self, progress: Dict[str, Any], rows: List[Tuple]):
+        self._upsert_words(rows)
+        digest = hashlib.blake2b(dump_json(progress), digest_size=16).digest()
+        if digest == self._last_hash:
+            return
+        progress["timestamp"] = datetime.now().isoformat()
+        path = self.data_dir / "progress.json"
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(dump_json(progress))
+        os.replace(tmp_path, path)
+        self._last_hash = digest
+
+    def load_profile(self) -> Optional[UserProfile]:
+        path = self.data_dir / "progress.json"
         try:
-            with open(self.data_dir / "progress.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-            profile = UserProfile.from_dict(data["profile"])
-            words = []
-            for word_dict in data["words"]:
-                if word_dict.get('last_reviewed'):
-                    word_dict['last_reviewed'] = datetime.fromisoformat(word_dict['last_reviewed'])
-                words.append(WordData(**word_dict))
-            return profile, words
+            if ijson is not None and path.stat().st_size >= STREAM_PARSE_MIN_BYTES:
+                # "profile" is written before "words", so streaming stops before the word list
+                with open(path, "rb") as f:
+                    data = next(ijson.items(f, "profile"), None)
+            else:
+                data = read_json(path).get("profile")
+            return UserProfile.from_dict(data) if data else None
         except FileNotFoundError:
-            return None, []
+            return None
+        except PROGRESS_LOAD_ERRORS as e:
+            logger.warning("Profile load failed: %s", e)
+            return None
+
+    def _read_word_rows(self) -> Dict[str, Tuple]:
+        self._db()
+        return dict(self._saved_rows)
+
+    def load_word_progress(self) -> Dict[str, Tuple]:
+        return self._submit(self._read_word_rows).result()
+
+@st.cache_resource
+def get_storage() -> LearningStorage:
+    return LearningStorage()
 
 # ============================================================================
 # FIXED AUDIO MANAGER (NO LOOP, SINGLE-AUDIO ENFORCEMENT)
 # ============================================================================
+AUDIO_CACHE_DIR = Path("audio_cache")
+
+@lru_cache(maxsize=4096)
+def audio_cache_key(text: str, slow: bool) -> str:
+    if not text:
+        return ""
+    key_string = f"{text}_{slow}"
+    return hashlib.blake2b(key_string.encode(), digest_size=16).hexdigest()
+
+def audio_cache_path(cache_key: str) -> Path:
+    # Fan out over 256 subdirectories so no single directory grows huge
+    return AUDIO_CACHE_DIR / cache_key[:2] / f"{cache_key}.mp3"
+
+@lru_cache(maxsize=2048)
+def read_cached_audio(cache_key: str) -> bytes:
+    return audio_cache_path(cache_key).read_bytes()
+
+def synthesize_audio(text: str, slow: bool) -> bytes:
+    cache_key = audio_cache_key(text, slow)
+    try:
+        return read_cached_audio(cache_key)
+    except FileNotFoundError:
+        pass
+    cache_file = audio_cache_path(cache_key)
+    # Imported here so app start-up doesn't pay for gTTS and its HTTP stack until a cache miss
+    from gtts import gTTS
+    tts = gTTS(text=text, lang='en', slow=slow)
+    audio_bytes = io.BytesIO()
+    tts.write_to_fp(audio_bytes)
+    audio_data = audio_bytes.getvalue()
+    cache_file.parent.mkdir(exist_ok=True)
+    # Write under a unique temp name and rename, so a crash never leaves a truncated MP3
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{uuid.uuid4().hex}.tmp")
+    tmp_file.write_bytes(audio_data)
+    os.replace(tmp_file, cache_file)
+    return audio_data
+
 class AudioManager:
     def __init__(self):
-        self.cache_dir = Path("audio_cache")
+        self.cache_dir = AUDIO_CACHE_DIR
         self.cache_dir.mkdir(exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=config.get("audio.prefetch_workers", 8), thread_name_prefix="tts")
+        self._pending: Dict[str, Future] = {}
+        self._remove_flat_cache()
 
-    def _get_cache_key(self, text: str, slow: bool) -> str:
-        if not text:
-            return ""
-        key_string = f"{text}_{slow}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+    def _remove_flat_cache(self) -> None:
+        # Older versions kept clips directly in audio_cache/ under MD5 names that
+        # the current keys never look up, so they are only wasted disk space
+        with os.scandir(self.cache_dir) as entries:
+            flat_files = [entry.path for entry in entries if entry.name.endswith(".mp3") and entry.is_file()]
+        for path in flat_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def prefetch(self, texts: List[str], slow: bool = True) -> None:
+        # gTTS calls are network-bound, so uncached texts are synthesised in
+        # the background; later generate_audio() calls then hit the disk cache.
+        for text in dict.fromkeys(texts):
+            if not text or text.strip() in (".", ""):
+                continue
+            key = audio_cache_key(text, slow)
+            if key in self._pending or audio_cache_path(key).exists():
+                continue
+            future = self._pool.submit(synthesize_audio, text, slow)
+            self._pending[key] = future
+            future.add_done_callback(lambda _, key=key: self._pending.pop(key, None))
 
     def generate_audio(self, text: str, slow: bool = True) -> Optional[bytes]:
         if not text or text.strip() in (".", "", None):
             return None
-        cache_key = self._get_cache_key(text, slow)
-        cache_file = self.cache_dir / f"{cache_key}.mp3"
-        if cache_file.exists():
-            return cache_file.read_bytes()
         try:
-            tts = gTTS(text=text, lang='en', slow=slow)
-            audio_bytes = io.BytesIO()
-            tts.write_to_fp(audio_bytes)
-            audio_bytes.seek(0)
-            audio_data = audio_bytes.read()
-            cache_file.write_bytes(audio_data)
-            return audio_data
+            return synthesize_audio(text, slow)
         except Exception as e:
             st.error(f"Audio generation failed: {str(e)}")
             return None
 
-    def create_audio_player(self, audio_bytes: bytes, text: str = "", context: str = "") -> None:
+    def create_audio_player(self, audio_bytes: bytes) -> None:
         if not audio_bytes:
             return
 
-        unique_id = str(uuid.uuid4()).replace("-", "")[:12]
-        active_key = f"active_audio_id_{context}" if context else "active_audio_id"
-        st.session_state[active_key] = unique_id
-
-        import base64
-        audio_b64 = base64.b64encode(audio_bytes).decode()
-
-        js_code = f"""
-        <script>
-        (function() {{
-            const playerId = 'audio_{unique_id}';
-            const newAudio = document.getElementById(playerId);
-            if (!newAudio) return;
-            const allAudios = document.querySelectorAll('audio');
-            allAudios.forEach(audio => {{
-                if (audio.id !== playerId) {{
-                    audio.pause();
-                    audio.currentTime = 0;
-                }}
-            }});
-            newAudio.currentTime = 0;
-            newAudio.load();
-            newAudio.onended = null;
-        }})();
-        </script>
-        """
-
-        html_code = f"""
-        <div style="margin: 10px 0;">
-            <audio id="audio_{unique_id}" src="data:audio/mp3;base64,{audio_b64}" preload="auto" controls></audio>
-        </div>
-        """
-
-        st.markdown(html_code + js_code, unsafe_allow_html=True)
+        # Served from Streamlit's media endpoint instead of an inline base64 data URI
+        st.audio(audio_bytes, format="audio/mp3")
 
     def clear_cache(self):
-        for file in self.cache_dir.glob("*.mp3"):
+        read_cached_audio.cache_clear()
+        for file in self.cache_dir.rglob("*.mp3"):
             try:
                 file.unlink()
             except Exception:
                 pass
         st.success("Audio cache cleared!")
 
+@st.cache_resource
+def get_audio_manager() -> AudioManager:
+    return AudioManager()
+
 # ============================================================================
 # LEARNING ENGINE
 # ============================================================================
 class LearningEngine:
     def __init__(self):
-        self.storage = LearningStorage()
-        self.audio_manager = AudioManager()
+        self.storage = get_storage()
+        self.audio_manager = get_audio_manager()
 
     def get_spaced_repetition_words(self, words: List[WordData], limit: int = 20) -> List[WordData]:
-        review_words = [w for w in words if w.needs_review]
+        now = datetime.now()
+        review_words = [w for w in words if w.is_due(now)]
         review_words.sort(key=lambda w: w.mastery_level)
         return review_words[:limit]
 
     def update_word_mastery(self, word: WordData, correct: bool):
         word.review_count += 1
-        word.last_reviewed = datetime.now()
+        word.last_reviewed = datetime.now().isoformat()
         if correct:
             word.mastery_level = min(1.0, word.mastery_level + 0.2)
         else:
             word.mastery_level = max(0.0, word.mastery_level - 0.1)
+        word.refresh_labels()
+        self.storage.update_word(word)
 
     def calculate_streak(self, profile: UserProfile) -> int:
         if not profile.last_session:
@@ -259,10 +498,15 @@ class LearningEngine:
         else:
             return 0
 
+@st.cache_resource
+def get_engine() -> LearningEngine:
+    return LearningEngine()
+
 # ============================================================================
 # UI COMPONENTS
 # ============================================================================
-def load_css(dark_mode: bool = False):
+@lru_cache(maxsize=2)
+def build_css(dark_mode: bool) -> str:
     theme = {
         "bg": "#1a1a1a" if dark_mode else "#ffffff",
         "text": "#ffffff" if dark_mode else "#000000",
@@ -273,7 +517,7 @@ def load_css(dark_mode: bool = False):
         "warning": "#ffd43b",
         "card_bg": "#2d2d2d" if dark_mode else "#f8f9fa"
     }
-    st.markdown(f"""
+    return f"""
     <style>
     .stApp {{ background: {theme["bg"]}; color: {theme["text"]}; }}
     .current-word {{ background: linear-gradient(45deg, {theme["primary"]}, {theme["secondary"]}); color: white; padding: 20px; border-radius: 15px; font-size: 2.5rem; font-weight: bold; margin: 15px 0; display: inline-block; box-shadow: 0 6px 20px rgba(0,0,0,0.2); }}
@@ -293,54 +537,86 @@ def load_css(dark_mode: bool = False):
     .quiz-option.correct {{ background: #d4edda; border-color: #28a745; }}
     .quiz-option.incorrect {{ background: #f8d7da; border-color: #dc3545; }}
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def load_css(dark_mode: bool = False):
+    # Must be emitted on every rerun (Streamlit drops elements that aren't re-rendered),
+    # but the stylesheet itself is only built once per theme
+    st.markdown(build_css(dark_mode), unsafe_allow_html=True)
+
+def select_word(word: WordData):
+    st.session_state.current_word = word
+
+def rate_word(engine: LearningEngine, word: WordData, correct: bool):
+    engine.update_word_mastery(word, correct)
+    st.toast("Progress recorded")
 
-def render_word_details(word: WordData, audio_manager: AudioManager):
+def render_word_details(word: WordData, audio_manager: AudioManager, engine: LearningEngine):
     col1, col2 = st.columns([2, 1])
     with col1:
-        st.markdown(f'<div class="word-details">', unsafe_allow_html=True)
-        st.markdown(f'<div style="font-size: 3rem;">{word.image_hint} {word.english}</div>', unsafe_allow_html=True)
-        st.markdown(f'<div style="font-size: 2.5rem;">{word.hindi}</div>', unsafe_allow_html=True)
-        st.markdown(f'<div style="font-size: 1.5rem;">[{word.phonetic}]</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        st.markdown('<div class="mnemonic-box">', unsafe_allow_html=True)
-        st.markdown(f"**💡 Memory Tip:** {word.mnemonic}")
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(word.details_html, unsafe_allow_html=True)
         st.info(f"**Example:** {word.example_sentence}")
-        st.markdown(f"**Mastery:** {int(word.mastery_level * 100)}%")
-        st.markdown(f"""
-        <div class="progress-bar">
-            <div class="progress-fill" style="width: {word.mastery_level * 100}%">
-                {int(word.mastery_level * 100)}%
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(word.mastery_bar_html, unsafe_allow_html=True)
     with col2:
         st.markdown("### 🎧 Listen")
-        audio_bytes = audio_manager.generate_audio(word.english)
-        if audio_bytes:
-            audio_manager.create_audio_player(audio_bytes, word.english, f"word_{word.english}")
-        if word.example_sentence:
-            st.markdown("**Sentence:**")
+        if st.button("🔊 Play word", key="word_play", use_container_width=True):
+            audio_bytes = audio_manager.generate_audio(word.english)
+            if audio_bytes:
+                audio_manager.create_audio_player(audio_bytes)
+        if word.example_sentence and st.button("🔊 Play sentence", key="word_play_sentence", use_container_width=True):
             sent_audio = audio_manager.generate_audio(word.example_sentence, slow=False)
             if sent_audio:
-                audio_manager.create_audio_player(sent_audio, word.example_sentence, f"sentence_{word.example_sentence}")
+                audio_manager.create_audio_player(sent_audio)
         st.markdown("---")
         st.markdown("**Rate your knowledge:**")
         col_btn1, col_btn2 = st.columns(2)
         with col_btn1:
-            if st.button("✅ I know this", key=f"know_{word.english}", use_container_width=True):
-                return True
+            st.button("✅ I know this", key="word_know", use_container_width=True, on_click=rate_word, args=(engine, word, True))
         with col_btn2:
-            if st.button("❌ Need practice", key=f"dontknow_{word.english}", use_container_width=True):
-                return False
-    return None
+            st.button("❌ Need practice", key="word_dont_know", use_container_width=True, on_click=rate_word, args=(engine, word, False))
+
+@fragment
+def render_word_grid(story: Dict, story_idx: int, audio_manager: AudioManager, engine: LearningEngine):
+    st.markdown("### 🎯 Click any word to learn:")
+    cols_per_row = 4
+    words = story['content']
+    page_size = config.get("ui.words_per_page", 40)
+    total_pages = max(1, math.ceil(len(words) / page_size))
+    page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, key=f"word_page_{story_idx}") if total_pages > 1 else 1
+    page_start = (page - 1) * page_size
+    page_words = words[page_start : page_start + page_size]
+    for row_start in range(0, len(page_words), cols_per_row):
+        row = page_words[row_start : row_start + cols_per_row]
+        global_idx = page_start + row_start
+        cols = st.columns(len(row))
+        for col_offset, word_data in enumerate(row):
+            with cols[col_offset]:
+                unique_key = f"word_{story_idx}_{global_idx + col_offset}_{word_data.display_word}"
+                st.button(
+                    word_data.button_label,
+                    key=unique_key,
+                    use_container_width=True,
+                    help=word_data.button_help,
+                    on_click=select_word,
+                    args=(word_data,)
+                )
+
+    if st.session_state.current_word:
+        st.markdown("---")
+        render_word_details(st.session_state.current_word, audio_manager, engine)
+
+ACHIEVEMENT_BADGES = (
+    (lambda profile, learned: profile.streak_days >= 7, "🔥 Week Warrior"),
+    (lambda profile, learned: profile.streak_days >= 30, "📅 Monthly Master"),
+    (lambda profile, learned: learned >= 50, "🎯 Word Champion"),
+)
 
 def render_dashboard(profile: UserProfile, words: List[WordData]):
     st.markdown("## 📊 Your Learning Dashboard")
     learned = sum(1 for w in words if w.mastery_level >= 0.8)
     avg_mastery = sum(w.mastery_level for w in words) / len(words) if words else 0
-    due_today = sum(1 for w in words if w.needs_review)
+    now = datetime.now()
+    due_today = sum(1 for w in words if w.is_due(now))
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.markdown('<div class="stats-card">', unsafe_allow_html=True)
@@ -358,196 +634,292 @@ def render_dashboard(profile: UserProfile, words: List[WordData]):
         st.markdown('<div class="stats-card">', unsafe_allow_html=True)
         st.metric("📝 Due for Review", due_today)
         st.markdown('</div>', unsafe_allow_html=True)
-    achievements = []
-    if profile.streak_days >= 7: achievements.append("🔥 Week Warrior")
-    if profile.streak_days >= 30: achievements.append("📅 Monthly Master")
-    if learned >= 50: achievements.append("🎯 Word Champion")
+    achievements = [badge for unlocked, badge in ACHIEVEMENT_BADGES if unlocked(profile, learned)]
     if achievements:
         st.markdown("### 🏆 Achievements")
         for badge in achievements:
             st.markdown(f'<span class="achievement-badge">{badge}</span>', unsafe_allow_html=True)
 
+@fragment
+def render_sidebar(profile: UserProfile, audio_manager: AudioManager):
+    new_name = st.text_input("Your Name", profile.name)
+    if new_name != profile.name:
+        profile.name = new_name
+        st.success(f"Welcome, {new_name}!")
+    profile.auto_play_audio = st.checkbox("Auto-play audio", profile.auto_play_audio)
+    dark_mode = st.checkbox("Dark Mode", profile.dark_mode)
+    pace = st.select_slider("Learning Pace", options=["slow", "normal", "fast"], value=profile.learning_pace)
+    profile.learning_pace = pace
+    if st.button("🗑️ Clear Audio Cache"):
+        audio_manager.clear_cache()
+    if dark_mode != profile.dark_mode:
+        # The theme CSS is injected by main(), so a theme switch needs a full rerun
+        profile.dark_mode = dark_mode
+        st.rerun()
+
+@fragment
+def render_browse_all(sorted_words: List[WordData], audio_manager: AudioManager):
+    # An expander runs its body even while collapsed, so the table is only built when switched on
+    if not st.toggle("📚 Browse All Words", key="browse_open"):
+        return
+    needle = st.text_input("Search words...").lower()
+    filtered_words = [w for w in sorted_words if not needle or needle in w.english_lc or needle in w.hindi_lc]
+    st.dataframe(pd.DataFrame({
+        "English": [f"{w.english} {w.image_hint}" for w in filtered_words],
+        "Hindi": [w.hindi for w in filtered_words],
+        "Mastery (%)": [int(w.mastery_level * 100) for w in filtered_words]
+    }), use_container_width=True, hide_index=True)
+    listen_word = st.selectbox("🔊 Listen to a word", [w.english for w in filtered_words], index=None, key="browse_listen_word")
+    if listen_word:
+        audio_bytes = audio_manager.generate_audio(listen_word)
+        if audio_bytes:
+            audio_manager.create_audio_player(audio_bytes)
+
 # ============================================================================
 # STORY LOADER
 # ============================================================================
-def load_all_story_files():
-    stories = []
-    json_files = glob.glob("story*.json") + glob.glob("*.json")
-    unique_files = list(set(json_files))
-    story_files = [f for f in unique_files if f not in ["progress.json", "stories.json"] and os.path.exists(f)]
-    word_emojis = {word: emoji for word, emoji in {
-        "I": "👤", "we": "👥", "you": "👉", "he": "👨", "she": "👩", "it": "🐾",
-        "they": "👨‍👩‍👧‍👦", "this": "👇", "that": "👆", "these": "👇👇", "those": "👆👆",
-        "my": "🎁", "your": "🎯", "his": "🎩", "her": "💍", "our": "🏠", "their": "🏘️",
-        "the": "⭐", "a": "1️⃣", "an": "🔤",
-        "am": "🟰", "is": "🟰", "are": "🟰", "was": "🕐", "were": "🕑",
-        "have": "🤲", "has": "🖐️", "had": "🕰️",
-        "do": "🔨", "does": "🔧", "did": "⏮️",
-        "see": "👁️", "look": "👀", "watch": "📺",
-        "like": "❤️", "love": "💖", "want": "🎯", "need": "❗",
-        "play": "🎮", "run": "🏃", "jump": "🤸", "walk": "🚶",
-        "eat": "🍎", "drink": "🥤", "sleep": "😴", "wake": "⏰",
-        "cat": "🐱", "dog": "🐶", "bird": "🐦", "fish": "🐠", "ball": "⚽",
-        "house": "🏠", "home": "🏡", "car": "🚗", "bus": "🚌", "book": "📚",
-        "pen": "🖊️", "pencil": "✏️", "paper": "📄", "table": "🪑", "chair": "💺",
-        "boy": "👦", "girl": "👧", "man": "👨", "woman": "👩", "child": "🧒",
-        "happy": "😊", "sad": "😢", "big": "🐘", "small": "🐜", "tall": "🌳",
-        "short": "📏", "red": "🔴", "blue": "🔵", "green": "🟢", "yellow": "🟡",
-        "white": "⬜", "black": "⬛", "good": "👍", "bad": "👎", "hot": "🔥",
-        "cold": "❄️", "new": "🆕", "old": "🕰️", "young": "👶", "fast": "⚡",
-        "slow": "🐌", "clean": "✨", "dirty": "💩", "fluffy": "☁️", "round": "⭕",
-        "and": "➕", "but": "🚫", "or": "🤔", "if": "❓", "because": "🔍",
-        "in": "📦", "on": "🔼", "at": "📍", "to": "➡️", "from": "⬅️",
-        "with": "🤝", "without": "🙅", "for": "🎁", "of": "🔗", "by": "👤",
-        "up": "⬆️", "down": "⬇️", "here": "📍", "there": "🗺️", "now": "⏰",
-        "then": "⏳", "always": "♾️", "never": "❌", "sometimes": "⏱️"
-    }.items()}
-    categories = {k: v for k, v in {
-        "i": "pronoun", "we": "pronoun", "you": "pronoun", "he": "pronoun",
-        "she": "pronoun", "it": "pronoun", "they": "pronoun", "this": "pronoun",
-        "that": "pronoun", "these": "pronoun", "those": "pronoun", "my": "pronoun",
-        "your": "pronoun", "his": "pronoun", "her": "pronoun", "our": "pronoun",
-        "their": "pronoun",
-        "the": "article", "a": "article", "an": "article",
-        "am": "verb", "is": "verb", "are": "verb", "was": "verb", "were": "verb",
-        "have": "verb", "has": "verb", "had": "verb", "do": "verb", "does": "verb",
-        "did": "verb", "see": "verb", "look": "verb", "watch": "verb", "like": "verb",
-        "love": "verb", "want": "verb", "need": "verb", "play": "verb", "run": "verb",
-        "jump": "verb", "walk": "verb", "eat": "verb", "drink": "verb", "sleep": "verb",
-        "wake": "verb",
-        "cat": "noun", "dog": "noun", "bird": "noun", "fish": "noun", "ball": "noun",
-        "house": "noun", "home": "noun", "car": "noun", "bus": "noun", "book": "noun",
-        "pen": "noun", "pencil": "noun", "paper": "noun", "table": "noun", "chair": "noun",
-        "boy": "noun", "girl": "noun", "man": "noun", "woman": "noun", "child": "noun",
-        "happy": "adjective", "sad": "adjective", "big": "adjective", "small": "adjective",
-        "tall": "adjective", "short": "adjective", "red": "adjective", "blue": "adjective",
-        "green": "adjective", "yellow": "adjective", "white": "adjective", "black": "adjective",
-        "good": "adjective", "bad": "adjective", "hot": "adjective", "cold": "adjective",
-        "new": "adjective", "old": "adjective", "young": "adjective", "fast": "adjective",
-        "slow": "adjective", "clean": "adjective", "dirty": "adjective", "fluffy": "adjective",
-        "round": "adjective",
-        "in": "preposition", "on": "preposition", "at": "preposition", "to": "preposition",
-        "from": "preposition", "with": "preposition", "without": "preposition", "for": "preposition",
-        "of": "preposition", "by": "preposition", "up": "preposition", "down": "preposition",
-        "and": "conjunction", "but": "conjunction", "or": "conjunction", "if": "conjunction",
-        "because": "conjunction"
-    }.items()}
-    for story_file in sorted(story_files):
+WORD_EMOJIS = {
+    "I": "👤", "we": "👥", "you": "👉", "he": "👨", "she": "👩", "it": "🐾",
+    "they": "👨‍👩‍👧‍👦", "this": "👇", "that": "👆", "these": "👇👇", "those": "👆👆",
+    "my": "🎁", "your": "🎯", "his": "🎩", "her": "💍", "our": "🏠", "their": "🏘️",
+    "the": "⭐", "a": "1️⃣", "an": "🔤",
+    "am": "🟰", "is": "🟰", "are": "🟰", "was": "🕐", "were": "🕑",
+    "have": "🤲", "has": "🖐️", "had": "🕰️",
+    "do": "🔨", "does": "🔧", "did": "⏮️",
+    "see": "👁️", "look": "👀", "watch": "📺",
+    "like": "❤️", "love": "💖", "want": "🎯", "need": "❗",
+    "play": "🎮", "run": "🏃", "jump": "🤸", "walk": "🚶",
+    "eat": "🍎", "drink": "🥤", "sleep": "😴", "wake": "⏰",
+    "cat": "🐱", "dog": "🐶", "bird": "🐦", "fish": "🐠", "ball": "⚽",
+    "house": "🏠", "home": "🏡", "car": "🚗", "bus": "🚌", "book": "📚",
+    "pen": "🖊️", "pencil": "✏️", "paper": "📄", "table": "🪑", "chair": "💺",
+    "boy": "👦", "girl": "👧", "man": "👨", "woman": "👩", "child": "🧒",
+    "happy": "😊", "sad": "😢", "big": "🐘", "small": "🐜", "tall": "🌳",
+    "short": "📏", "red": "🔴", "blue": "🔵", "green": "🟢", "yellow": "🟡",
+    "white": "⬜", "black": "⬛", "good": "👍", "bad": "👎", "hot": "🔥",
+    "cold": "❄️", "new": "🆕", "old": "🕰️", "young": "👶", "fast": "⚡",
+    "slow": "🐌", "clean": "✨", "dirty": "💩", "fluffy": "☁️", "round": "⭕",
+    "and": "➕", "but": "🚫", "or": "🤔", "if": "❓", "because": "🔍",
+    "in": "📦", "on": "🔼", "at": "📍", "to": "➡️", "from": "⬅️",
+    "with": "🤝", "without": "🙅", "for": "🎁", "of": "🔗", "by": "👤",
+    "up": "⬆️", "down": "⬇️", "here": "📍", "there": "🗺️", "now": "⏰",
+    "then": "⏳", "always": "♾️", "never": "❌", "sometimes": "⏱️"
+}
+
+WORD_CATEGORIES = {
+    "i": "pronoun", "we": "pronoun", "you": "pronoun", "he": "pronoun",
+    "she": "pronoun", "it": "pronoun", "they": "pronoun", "this": "pronoun",
+    "that": "pronoun", "these": "pronoun", "those": "pronoun", "my": "pronoun",
+    "your": "pronoun", "his": "pronoun", "her": "pronoun", "our": "pronoun",
+    "their": "pronoun",
+    "the": "article", "a": "article", "an": "article",
+    "am": "verb", "is": "verb", "are": "verb", "was": "verb", "were": "verb",
+    "have": "verb", "has": "verb", "had": "verb", "do": "verb", "does": "verb",
+    "did": "verb", "see": "verb", "look": "verb", "watch": "verb", "like": "verb",
+    "love": "verb", "want": "verb", "need": "verb", "play": "verb", "run": "verb",
+    "jump": "verb", "walk": "verb", "eat": "verb", "drink": "verb", "sleep": "verb",
+    "wake": "verb",
+    "cat": "noun", "dog": "noun", "bird": "noun", "fish": "noun", "ball": "noun",
+    "house": "noun", "home": "noun", "car": "noun", "bus": "noun", "book": "noun",
+    "pen": "noun", "pencil": "noun", "paper": "noun", "table": "noun", "chair": "noun",
+    "boy": "noun", "girl": "noun", "man": "noun", "woman": "noun", "child": "noun",
+    "happy": "adjective", "sad": "adjective", "big": "adjective", "small": "adjective",
+    "tall": "adjective", "short": "adjective", "red": "adjective", "blue": "adjective",
+    "green": "adjective", "yellow": "adjective", "white": "adjective", "black": "adjective",
+    "good": "adjective", "bad": "adjective", "hot": "adjective", "cold": "adjective",
+    "new": "adjective", "old": "adjective", "young": "adjective", "fast": "adjective",
+    "slow": "adjective", "clean": "adjective", "dirty": "adjective", "fluffy": "adjective",
+    "round": "adjective",
+    "in": "preposition", "on": "preposition", "at": "preposition", "to": "preposition",
+    "from": "preposition", "with": "preposition", "without": "preposition", "for": "preposition",
+    "of": "preposition", "by": "preposition", "up": "preposition", "down": "preposition",
+    "and": "conjunction", "but": "conjunction", "or": "conjunction", "if": "conjunction",
+    "because": "conjunction"
+}
+
+EXAMPLE_TEMPLATES = {
+    "pronoun": "{} am learning English.",
+    "verb": "I {} every day.",
+    "noun": "This is a {}.",
+    "adjective": "The {} cat.",
+    "article": "{} book is interesting.",
+}
+DEFAULT_EXAMPLE_TEMPLATE = "This is the word '{}'"
+
+# Files at least this large are streamed with ijson (when installed) instead
+# of being parsed into one big dict first
+STREAM_PARSE_MIN_BYTES = 256 * 1024
+STORY_HEADER_KEYS = ("title", "hindi_title", "level")
+
+def read_story_file(story_file: str) -> Tuple[Dict, Iterator[Dict]]:
+    if ijson is None or os.path.getsize(story_file) < STREAM_PARSE_MIN_BYTES:
+        story_data = read_json(story_file)
+        return story_data, iter(story_data.get("content", []))
+    header = {}
+    with open(story_file, "rb") as f:
+        # Header keys normally precede "content", so stop as soon as all are seen
+        for prefix, event, value in ijson.parse(f):
+            if prefix in STORY_HEADER_KEYS and event == "string":
+                header[prefix] = value
+                if len(header) == len(STORY_HEADER_KEYS):
+                    break
+    def stream_content():
+        with open(story_file, "rb") as f:
+            yield from ijson.items(f, "content.item")
+    return header, stream_content()
+
+def parse_story_file(story_file: str) -> Dict:
+    story_data, content = read_story_file(story_file)
+    level = story_data.get("level", "Beginner")
+    difficulty = 1 if level == "Beginner" else 2 if level == "Intermediate" else 3
+    word_objects = []
+    for word_dict in content:
+        english_word = word_dict.get("english", "")
+        if not english_word: continue
+        lookup = english_word.lower()
+        category = WORD_CATEGORIES.get(lookup, "general")
+        hindi = word_dict.get("hindi", "")
+        word_objects.append(WordData(
+            english=english_word,
+            hindi=hindi,
+            phonetic=word_dict.get("phonetic", "/?/"),
+            category=category,
+            difficulty=difficulty,
+            example_sentence=EXAMPLE_TEMPLATES.get(category, DEFAULT_EXAMPLE_TEMPLATE).format(english_word),
+            mnemonic=f"Remember: '{english_word}' means '{hindi}'",
+            image_hint=WORD_EMOJIS.get(lookup, "📝")
+        ))
+    return {
+        "title": story_data.get("title", f"Story"),
+        "hindi_title": story_data.get("hindi_title", "कहानी"),
+        "difficulty": difficulty,
+        "level": level,
+        "filename": story_file,
+        "content": word_objects,
+        "word_count": len(word_objects),
+        "english_text": " ".join(word.english for word in word_objects),
+        "hindi_text": " ".join(word.hindi for word in word_objects)
+    }
+
+STORY_FILE_EXCLUDES = {"progress.json", "stories.json"}
+
+@st.cache_data(ttl=5, show_spinner=False)
+def list_story_files() -> List[Tuple[str, float]]:
+    with os.scandir(".") as entries:
+        return sorted(
+            (entry.name, entry.stat().st_mtime) for entry in entries
+            if entry.name.endswith(".json") and entry.name not in STORY_FILE_EXCLUDES and entry.is_file()
+        )
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def load_story_set(fingerprint: Tuple[Tuple[str, float], ...]) -> Tuple[Tuple[Dict, ...], Tuple[Tuple[str, str], ...]]:
+    # Keyed on every (name, mtime) pair, so adding, removing or editing a file reparses
+    def load_one(story_file: str) -> Tuple[Optional[Dict], Optional[str]]:
         try:
-            with open(story_file, 'r', encoding='utf-8') as f:
-                story_data = json.load(f)
-            word_objects = []
-            for word_dict in story_data.get("content", []):
-                english_word = word_dict.get("english", "")
-                if not english_word: continue
-                emoji = word_emojis.get(english_word.lower(), "📝")
-                category = categories.get(english_word.lower(), "general")
-                if category == "pronoun": example = f"{english_word} am learning English."
-                elif category == "verb": example = f"I {english_word} every day."
-                elif category == "noun": example = f"This is a {english_word}."
-                elif category == "adjective": example = f"The {english_word} cat."
-                elif category == "article": example = f"{english_word} book is interesting."
-                else: example = f"This is the word '{english_word}'"
-                mnemonic = f"Remember: '{english_word}' means '{word_dict.get('hindi', '')}'"
-                level = story_data.get("level", "Beginner")
-                difficulty = 1 if level == "Beginner" else 2 if level == "Intermediate" else 3
-                word_obj = WordData(
-                    english=english_word,
-                    hindi=word_dict.get("hindi", ""),
-                    phonetic=word_dict.get("phonetic", "/?/"),
-                    category=category,
-                    difficulty=difficulty,
-                    example_sentence=example,
-                    mnemonic=mnemonic,
-                    image_hint=emoji
-                )
-                word_objects.append(word_obj)
-            story = {
-                "title": story_data.get("title", f"Story"),
-                "hindi_title": story_data.get("hindi_title", "कहानी"),
-                "difficulty": difficulty,
-                "level": level,
-                "filename": story_file,
-                "content": word_objects
-            }
-            stories.append(story)
+            return parse_story_file(story_file), None
         except Exception as e:
-            st.sidebar.warning(f"Could not load {story_file}: {str(e)}")
-    return stories
+            logger.debug("Could not load %s", story_file, exc_info=True)
+            return None, str(e)
+
+    story_files = [story_file for story_file, _ in fingerprint]
+    if len(story_files) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(story_files)), thread_name_prefix="story") as pool:
+            results = list(pool.map(load_one, story_files))
+    else:
+        results = [load_one(story_file) for story_file in story_files]
+    stories = tuple(story for story, _ in results if story is not None)
+    errors = tuple((story_file, error) for story_file, (_, error) in zip(story_files, results) if error is not None)
+    return stories, errors
+
+def build_story_labels(stories: List[Dict]) -> Tuple[str, ...]:
+    labels = []
+    for s in stories:
+        level_emoji = "🟢" if s.get('difficulty', 1) == 1 else "🟡" if s.get('difficulty', 1) == 2 else "🔴"
+        labels.append(f"{level_emoji} {s['title']} ({s['hindi_title']}) - {s['word_count']} words")
+    return tuple(labels)
 
 # ============================================================================
 # FLASHCARDS (10)
 # ============================================================================
+def reset_flashcard_session():
+    st.session_state.pop('flashcard_session', None)
+
+def reveal_flashcard():
+    st.session_state.flashcard_session['show_answer'] = True
+
+def advance_flashcard(engine: LearningEngine, word: WordData, correct: bool, rated: bool = True):
+    session = st.session_state.flashcard_session
+    if rated:
+        engine.update_word_mastery(word, correct)
+    session['completed'].append((word, correct))
+    session['current_index'] += 1
+    session['show_answer'] = False
+
+FLASHCARD_RATINGS = {
+    "✅ Easy": True,
+    "🟡 Medium": True,
+    "❌ Hard": False,
+    "⏭️ Next": False,
+}
+
+def rate_flashcard(engine: LearningEngine, word: WordData):
+    rating = st.session_state.flashcard_rating
+    # Clear the control so the next card starts with nothing selected
+    st.session_state.flashcard_rating = None
+    if rating is not None:
+        advance_flashcard(engine, word, FLASHCARD_RATINGS[rating])
+
+def render_rating_row(word: WordData, engine: LearningEngine):
+    segmented_control(
+        "How well did you know this word?",
+        list(FLASHCARD_RATINGS),
+        key="flashcard_rating",
+        on_change=rate_flashcard,
+        args=(engine, word),
+        label_visibility="collapsed"
+    )
+
+@fragment
 def render_flashcards(review_words: List[WordData], audio_manager: AudioManager, engine: LearningEngine):
     if 'flashcard_session' not in st.session_state:
         st.session_state.flashcard_session = {'words': review_words[:10], 'current_index': 0, 'show_answer': False, 'completed': []}
+        audio_manager.prefetch([w.english for w in st.session_state.flashcard_session['words']])
     session = st.session_state.flashcard_session
     if not session['words']:
         st.success("🎉 All flashcards completed!")
-        if st.button("Start New Session"): del st.session_state.flashcard_session; st.rerun()
+        st.button("Start New Session", on_click=reset_flashcard_session)
+        return
+    if session['current_index'] >= len(session['words']):
+        show_flashcard_results(session['completed'], engine)
         return
     current_word = session['words'][session['current_index']]
     total_cards = len(session['words'])
     current_card = session['current_index'] + 1
     st.progress(current_card / total_cards)
     st.caption(f"Card {current_card} of {total_cards}")
-    st.markdown(f"""
-    <div class="flashcard">
-        <h1 style="font-size: 4rem;">{current_word.english}</h1>
-        <h2 style="font-size: 3rem;">{current_word.image_hint}</h2>
-    </div>
-    """, unsafe_allow_html=True)
+    # Warm the sentence audio for this card and the next while the user thinks
+    upcoming = session['words'][session['current_index'] : session['current_index'] + 2]
+    audio_manager.prefetch([w.example_sentence for w in upcoming])
+    st.markdown(current_word.flashcard_html, unsafe_allow_html=True)
     audio_bytes = audio_manager.generate_audio(current_word.english)
     if audio_bytes:
-        audio_manager.create_audio_player(audio_bytes, current_word.english, f"flashcard_{current_card}")
+        audio_manager.create_audio_player(audio_bytes)
     if not session['show_answer']:
         col1, col2 = st.columns([1, 2])
         with col1:
-            if st.button("🃏 Show Answer", type="primary", use_container_width=True):
-                session['show_answer'] = True
-                st.rerun()
+            st.button("🃏 Show Answer", type="primary", use_container_width=True, on_click=reveal_flashcard)
         with col2:
-            if st.button("⏭️ Skip Card", use_container_width=True):
-                session['completed'].append((current_word, False))
-                session['current_index'] += 1
-                session['show_answer'] = False
-                if session['current_index'] >= len(session['words']):
-                    show_flashcard_results(session['completed'], engine)
-                else:
-                    st.rerun()
+            st.button("⏭️ Skip Card", use_container_width=True, on_click=advance_flashcard, args=(engine, current_word, False, False))
     else:
-        st.markdown(f"""
-        <div style="background: white; padding: 30px; border-radius: 15px; margin: 20px 0; text-align: center;">
-            <h2 style="color: #ff6b6b; font-size: 3rem;">{current_word.hindi}</h2>
-            <p style="font-size: 1.5rem; color: #666;">{current_word.phonetic}</p>
-            <p style="font-size: 1.2rem; color: #888;">Category: {current_word.category}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(current_word.flashcard_answer_html, unsafe_allow_html=True)
         if current_word.example_sentence:
             st.info(f"**Example:** {current_word.example_sentence}")
             sent_audio = audio_manager.generate_audio(current_word.example_sentence)
             if sent_audio:
-                audio_manager.create_audio_player(sent_audio, current_word.example_sentence, f"flashcard_sent_{current_card}")
+                audio_manager.create_audio_player(sent_audio)
         st.markdown(f"**💡 Tip:** {current_word.mnemonic}")
         st.markdown("### How well did you know this word?")
-        col1, col2, col3, col4 = st.columns(4)
-        def advance(correct: bool):
-            engine.update_word_mastery(current_word, correct)
-            session['completed'].append((current_word, correct))
-            session['current_index'] += 1
-            session['show_answer'] = False
-            if session['current_index'] >= len(session['words']):
-                show_flashcard_results(session['completed'], engine)
-            else:
-                st.rerun()
-        with col1:
-            if st.button("✅ Easy", use_container_width=True, key=f"easy_{current_word.english}"): advance(True)
-        with col2:
-            if st.button("🟡 Medium", use_container_width=True, key=f"medium_{current_word.english}"): advance(True)
-        with col3:
-            if st.button("❌ Hard", use_container_width=True, key=f"hard_{current_word.english}"): advance(False)
-        with col4:
-            if st.button("⏭️ Next", use_container_width=True, key=f"next_{current_word.english}"): advance(False)
+        render_rating_row(current_word, engine)
 
 def show_flashcard_results(completed: List[Tuple[WordData, bool]], engine: LearningEngine):
     correct = sum(1 for _, correct in completed if correct)
@@ -559,15 +931,13 @@ def show_flashcard_results(completed: List[Tuple[WordData, bool]], engine: Learn
     with col2: st.metric("Correct", correct)
     with col3: st.metric("Total", total)
     with st.expander("📊 View Details"):
-        for word, was_correct in completed:
-            emoji = "✅" if was_correct else "❌"
-            mastery_emoji = word.get_mastery_badge()
-            st.write(f"{emoji} {mastery_emoji} **{word.english}** = {word.hindi} ({int(word.mastery_level * 100)}%)")
+        st.markdown("\n".join(
+            f"- {'✅' if was_correct else '❌'} {word.get_mastery_badge()} **{word.english}** = {word.hindi} ({int(word.mastery_level * 100)}%)"
+            for word, was_correct in completed
+        ))
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("🔄 Practice Again", use_container_width=True):
-            del st.session_state.flashcard_session
-            st.rerun()
+        st.button("🔄 Practice Again", use_container_width=True, on_click=reset_flashcard_session)
     with col2:
         if st.button("📚 Back to Learning", use_container_width=True):
             del st.session_state.flashcard_session
@@ -576,9 +946,32 @@ def show_flashcard_results(completed: List[Tuple[WordData, bool]], engine: Learn
 # ============================================================================
 # QUIZ (10)
 # ============================================================================
+def reset_quiz_session():
+    st.session_state.pop('quiz_session', None)
+
+def record_quiz_answer(engine: LearningEngine, skipped: bool = False):
+    session = st.session_state.quiz_session
+    idx = session['current_index']
+    question = session['questions'][idx]
+    if skipped:
+        selected_option, is_correct = "Skipped", False
+    else:
+        selected_option = st.session_state.quiz_option
+        is_correct = selected_option.strip() == question['correct'].strip()
+        engine.update_word_mastery(question['word'], is_correct)
+    session['answers'][idx] = {'word': question['word'], 'selected': selected_option, 'correct': question['correct'], 'is_correct': is_correct}
+    session['last_answer'] = session['answers'][idx]
+    session['current_index'] += 1
+    if session['current_index'] >= len(session['questions']): session['completed'] = True
+    # The radio keeps one key across questions; dropping its state resets it to the first option
+    st.session_state.pop('quiz_option', None)
+
+@fragment
 def render_quiz_session(review_words: List[WordData], audio_manager: AudioManager, engine: LearningEngine):
     if 'quiz_session' not in st.session_state:
-        st.session_state.quiz_session = {'questions': generate_quiz_questions(review_words, num_questions=10), 'current_index': 0, 'answers': [], 'completed': False}
+        questions = generate_quiz_questions(review_words, num_questions=10)
+        st.session_state.quiz_session = {'questions': questions, 'current_index': 0, 'answers': [None] * len(questions), 'completed': False}
+        audio_manager.prefetch([q['word'].english for q in questions])
     session = st.session_state.quiz_session
     if not session['questions']:
         st.info("Not enough words for a quiz. Learn more words first!")
@@ -591,6 +984,12 @@ def render_quiz_session(review_words: List[WordData], audio_manager: AudioManage
     current_q = session['current_index'] + 1
     st.progress(current_q / total_questions)
     st.caption(f"Question {current_q} of {total_questions}")
+    last_answer = session.get('last_answer')
+    if last_answer:
+        if last_answer['is_correct']:
+            st.success(f"✅ Correct! **{last_answer['word'].english}** = {last_answer['correct']}")
+        else:
+            st.error(f"❌ **{last_answer['word'].english}** = {last_answer['correct']}")
     st.markdown(f"""
     <div class="quiz-question">
         <h3>What is the Hindi translation of:</h3>
@@ -599,44 +998,36 @@ def render_quiz_session(review_words: List[WordData], audio_manager: AudioManage
     """, unsafe_allow_html=True)
     audio_bytes = audio_manager.generate_audio(question['word'].english)
     if audio_bytes:
-        audio_manager.create_audio_player(audio_bytes, question['word'].english, f"quiz_{current_q}")
-    selected_option = st.radio("Choose the correct translation:", question['options'], key=f"quiz_option_{session['current_index']}")
+        audio_manager.create_audio_player(audio_bytes)
+    st.radio("Choose the correct translation:", question['options'], key="quiz_option")
     col1, col2 = st.columns([1, 2])
     with col1:
-        if st.button("Submit Answer", type="primary", use_container_width=True):
-            is_correct = selected_option.strip() == question['correct'].strip()
-            session['answers'].append({'word': question['word'], 'selected': selected_option, 'correct': question['correct'], 'is_correct': is_correct})
-            engine.update_word_mastery(question['word'], is_correct)
-            session['current_index'] += 1
-            if session['current_index'] >= len(session['questions']): session['completed'] = True
-            st.rerun()
+        st.button("Submit Answer", type="primary", use_container_width=True, on_click=record_quiz_answer, args=(engine,))
     with col2:
-        if st.button("Skip Question", use_container_width=True):
-            session['answers'].append({'word': question['word'], 'selected': "Skipped", 'correct': question['correct'], 'is_correct': False})
-            session['current_index'] += 1
-            if session['current_index'] >= len(session['questions']): session['completed'] = True
-            st.rerun()
+        st.button("Skip Question", use_container_width=True, on_click=record_quiz_answer, args=(engine, True))
 
 def generate_quiz_questions(words: List[WordData], num_questions: int = 10) -> List[Dict]:
     if len(words) < 4: return []
     questions = []
     used_words = set()
-    for _ in range(min(num_questions, len(words))):
-        available_words = [w for w in words if w.english not in used_words]
-        if not available_words: break
-        word = random.choice(available_words)
+    pool = list(words)
+    random.shuffle(pool)
+    take = min(num_questions, len(pool))
+    all_hindi = list(dict.fromkeys(w.hindi for w in words))
+    for word in pool:
+        if len(questions) >= take: break
+        if word.english in used_words: continue
         used_words.add(word.english)
         correct = word.hindi
-        wrong_pool = [w.hindi for w in words if w.hindi != correct]
-        if len(wrong_pool) < 3: wrong_options = ["गलत", "अनुवाद", "शब्द"][:3]
-        else: wrong_options = random.sample(wrong_pool, 3)
+        if len(all_hindi) < 4: wrong_options = ["गलत", "अनुवाद", "शब्द"][:3]
+        else: wrong_options = [h for h in random.sample(all_hindi, 4) if h != correct][:3]
         options = [correct] + wrong_options
         random.shuffle(options)
         questions.append({'word': word, 'correct': correct, 'options': options})
     return questions
 
 def show_quiz_results(questions: List[Dict], answers: List[Dict], engine: LearningEngine):
-    correct_count = sum(1 for answer in answers if answer['is_correct'])
+    correct_count = sum(1 for answer in answers if answer is not None and answer['is_correct'])
     total = len(questions)
     score = (correct_count / total) * 100 if total > 0 else 0
     st.success("🎉 Quiz Complete!")
@@ -648,19 +1039,19 @@ def show_quiz_results(questions: List[Dict], answers: List[Dict], engine: Learni
     st.info(rating)
     with st.expander("📋 Review Answers"):
         for i, (question, answer) in enumerate(zip(questions, answers), 1):
+            if answer is None: continue
             emoji = "✅" if answer['is_correct'] else "❌"
             st.markdown(f"**Q{i}: {question['word'].english}**")
             st.markdown(f"{emoji} Your answer: **{answer['selected']}**" + (" (Correct!)" if answer['is_correct'] else ""))
             st.markdown(f"Correct answer: **{answer['correct']}**")
-            audio_bytes = engine.audio_manager.generate_audio(question['word'].english)
-            if audio_bytes:
-                engine.audio_manager.create_audio_player(audio_bytes, question['word'].english, f"review_{i}")
+            if st.button("🔊", key=f"review_play_{i}"):
+                audio_bytes = engine.audio_manager.generate_audio(question['word'].english)
+                if audio_bytes:
+                    engine.audio_manager.create_audio_player(audio_bytes)
             st.markdown("---")
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("🔄 Try Again", use_container_width=True):
-            del st.session_state.quiz_session
-            st.rerun()
+        st.button("🔄 Try Again", use_container_width=True, on_click=reset_quiz_session)
     with col2:
         if st.button("📚 Back to Learning", use_container_width=True):
             del st.session_state.quiz_session
@@ -669,63 +1060,81 @@ def show_quiz_results(questions: List[Dict], answers: List[Dict], engine: Learni
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
+SESSION_DEFAULTS = {
+    "current_word": None,
+    "current_story": 0,
+    "test_audio_triggered": False,
+    "story_fingerprint": None,
+    "story_errors": (),
+    "audio_warmed_story": None,
+}
+
+STORY_DERIVED_KEYS = (
+    "story_labels", "all_words", "all_words_index", "all_words_sorted", "unique_words",
+    "flashcard_session", "quiz_session",
+)
+
 def main():
-    storage = LearningStorage()
-    audio_manager = AudioManager()
-    engine = LearningEngine()
-    dark_mode = st.session_state.get('profile', UserProfile(name="Learner")).dark_mode
-    load_css(dark_mode)
-    st.title("📚 Bilingual English Master")
-    st.markdown("**Learn English through Hindi | Intelligent & Adaptive**")
-    
-    with st.sidebar:
-        if 'profile' not in st.session_state:
-            profile, _ = storage.load_progress()
-            if not profile: profile = UserProfile(name="Learner")
-            st.session_state.profile = profile
-        new_name = st.text_input("Your Name", st.session_state.profile.name)
-        if new_name != st.session_state.profile.name:
-            st.session_state.profile.name = new_name
-            st.success(f"Welcome, {new_name}!")
-        st.session_state.profile.auto_play_audio = st.checkbox("Auto-play audio", st.session_state.profile.auto_play_audio)
-        st.session_state.profile.dark_mode = st.checkbox("Dark Mode", st.session_state.profile.dark_mode)
-        pace = st.select_slider("Learning Pace", options=["slow", "normal", "fast"], value=st.session_state.profile.learning_pace)
-        st.session_state.profile.learning_pace = pace
-        if st.button("🗑️ Clear Audio Cache"):
-            audio_manager.clear_cache()
-
-    current_stories = load_all_story_files()
-    if 'stories' not in st.session_state:
-        st.session_state.stories = current_stories
-    else:
-        current_filenames = {s['filename'] for s in current_stories}
-        existing_filenames = {s.get('filename', '') for s in st.session_state.stories}
-        if current_filenames != existing_filenames:
-            st.session_state.stories = current_stories
+    for key, value in SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, value)
+
+    story_files = tuple(list_story_files())
+    # Only the (name, mtime) list is compared on a rerun; parsed stories are
+    # fetched when a file is added, removed or edited
+    if st.session_state.story_fingerprint != story_files:
+        stories, st.session_state.story_errors = load_story_set(story_files)
+        st.session_state.stories = list(stories)
+        st.session_state.story_fingerprint = story_files
+        # Everything derived from the old WordData objects is rebuilt (and the
+        # saved progress re-merged) further down, so ratings never start from 0
+        for key in STORY_DERIVED_KEYS:
+            st.session_state.pop(key, None)
+        st.session_state.current_word = None
+        st.session_state.audio_warmed_story = None
+    for story_file, error in st.session_state.story_errors:
+        st.sidebar.warning(f"Could not load {story_file}: {error}")
 
     if not st.session_state.stories:
         st.error("⚠️ No story files found! Please add JSON story files.")
         return
 
+    storage = get_storage()
+    audio_manager = get_audio_manager()
+    engine = get_engine()
+    if 'profile' not in st.session_state:
+        profile = storage.load_profile()
+        if not profile: profile = UserProfile(name="Learner")
+        st.session_state.profile = profile
+    load_css(st.session_state.profile.dark_mode)
+    st.title("📚 Bilingual English Master")
+    st.markdown("**Learn English through Hindi | Intelligent & Adaptive**")
+    
+    with st.sidebar:
+        render_sidebar(st.session_state.profile, audio_manager)
+
     if 'all_words' not in st.session_state:
+        # A word repeated within or across stories shares one WordData, so a
+        # rating is seen everywhere and no stale copy can overwrite it on save
+        all_words_index = {}
         all_words = []
         for story in st.session_state.stories:
+            story['content'] = [all_words_index.setdefault(word.english, word) for word in story['content']]
             all_words.extend(story['content'])
-        _, saved_words = storage.load_progress()
+        saved_words = storage.load_word_progress()
         if saved_words:
-            word_dict = {w.english: w for w in saved_words}
-            for word in all_words:
-                if word.english in word_dict:
-                    saved = word_dict[word.english]
-                    word.mastery_level = saved.mastery_level
-                    word.review_count = saved.review_count
-                    word.last_reviewed = saved.last_reviewed
+            for word in all_words_index.values():
+                if word.english in saved_words:
+                    word.mastery_level, word.last_reviewed, word.review_count = saved_words[word.english]
+                    word.refresh_labels()
         st.session_state.all_words = all_words
+        st.session_state.all_words_index = all_words_index
+        st.session_state.unique_words = len(st.session_state.all_words_index)
+        st.session_state.all_words_sorted = sorted(st.session_state.all_words_index.values(), key=lambda w: w.english)
 
     render_dashboard(st.session_state.profile, st.session_state.all_words)
     total_stories = len(st.session_state.stories)
     total_words = len(st.session_state.all_words)
-    unique_words = len(set(word.english for word in st.session_state.all_words))
+    unique_words = st.session_state.unique_words
     col1, col2, col3 = st.columns(3)
     with col1: st.metric("📚 Total Stories", total_stories)
     with col2: st.metric("📝 Total Words", total_words)
@@ -733,37 +1142,44 @@ def main():
 
     st.markdown("""
     <div class="important-note">
-        🔊 <strong>Audio now plays cleanly without overlapping or loop buttons.</strong><br>
-        Each word plays only one audio at a time. No more desynchronization!
+        🔊 <strong>Audio plays in your browser's built-in player.</strong><br>
+        Press play on any clip to hear it; clips are cached after the first play.
     </div>
     """, unsafe_allow_html=True)
 
     st.markdown("### 🎵 Step 1: Test Your Audio")
     if st.button("🔊 TEST AUDIO - Click First!", key="test_audio", type="primary", use_container_width=True):
         st.session_state.test_audio_triggered = True
-    if st.session_state.get('test_audio_triggered', False):
+    if st.session_state.test_audio_triggered:
         test_audio = audio_manager.generate_audio("Hello! Your audio is working perfectly!")
         if test_audio:
-            audio_manager.create_audio_player(test_audio, "Test Audio", "test_audio_player")
+            audio_manager.create_audio_player(test_audio)
         st.success("✅ Audio is ready! Play it without interference.")
 
     st.markdown("---")
-    story_options = {}
-    for i, s in enumerate(st.session_state.stories):
-        level_emoji = "🟢" if s.get('difficulty', 1) == 1 else "🟡" if s.get('difficulty', 1) == 2 else "🔴"
-        story_options[f"{level_emoji} {s['title']} ({s['hindi_title']}) - {len(s['content'])} words"] = i
+    if 'story_labels' not in st.session_state:
+        st.session_state.story_labels = build_story_labels(st.session_state.stories)
+    story_labels = st.session_state.story_labels
 
-    selected_story = st.selectbox("Choose a story:", options=list(story_options.keys()), index=st.session_state.get('current_story', 0))
-    story_idx = story_options[selected_story]
+    story_idx = st.selectbox(
+        "Choose a story:",
+        options=range(len(story_labels)),
+        format_func=story_labels.__getitem__,
+        index=min(st.session_state.current_story, len(story_labels) - 1)
+    )
     st.session_state.current_story = story_idx
     story = st.session_state.stories[story_idx]  # ✅ DEFINED HERE
 
     st.markdown(f"## 📖 {story['title']} - {story['hindi_title']}")
-    st.markdown(f"**Level:** {story.get('level', 'Beginner')} | **Words:** {len(story['content'])} | **Source:** `{story.get('filename', 'Unknown')}`")
+    st.markdown(f"**Level:** {story.get('level', 'Beginner')} | **Words:** {story['word_count']} | **Source:** `{story.get('filename', 'Unknown')}`")
 
     st.markdown("### 📖 Complete Story:")
-    story_text_english = " ".join([word.english for word in story['content']])
-    story_text_hindi = " ".join([word.hindi for word in story['content']])
+    story_text_english = story['english_text']
+    story_text_hindi = story['hindi_text']
+    # Warm the selected story's words in the background, once each time the story changes
+    if st.session_state.audio_warmed_story != story_idx:
+        audio_manager.prefetch([word.english for word in story['content']])
+        st.session_state.audio_warmed_story = story_idx
     col1, col2 = st.columns(2)
     with col1: st.markdown(f"**English:** {story_text_english}")
     with col2: st.markdown(f"**Hindi:** {story_text_hindi}")
@@ -771,42 +1187,10 @@ def main():
     if st.button("🎧 Listen to Full Story"):
         full_audio = audio_manager.generate_audio(story_text_english)
         if full_audio:
-            audio_manager.create_audio_player(full_audio, story_text_english, "full_story")
+            audio_manager.create_audio_player(full_audio)
 
     st.markdown("---")
-    st.markdown("### 🎯 Click any word to learn:")  # ✅ NOW SAFE — 'story' IS DEFINED
-    cols_per_row = 4
-    words = story['content']
-    for global_idx in range(0, len(words), cols_per_row):
-        row = words[global_idx : global_idx + cols_per_row]
-        cols = st.columns(len(row))
-        for col_offset, word_data in enumerate(row):
-            with cols[col_offset]:
-                display_word = word_data.english.strip()
-                if not display_word:
-                    display_word = "❓"
-                badge = word_data.get_mastery_badge()
-                unique_key = f"word_{story_idx}_{global_idx + col_offset}_{display_word}"
-                button_label = f"{badge} {display_word}"
-                if st.button(
-                    button_label,
-                    key=unique_key,
-                    use_container_width=True,
-                    help=f"{word_data.hindi} - {int(word_data.mastery_level * 100)}% mastered"
-                ):
-                    st.session_state.current_word = word_data
-                    st.rerun()
-
-    if 'current_word' in st.session_state and st.session_state.current_word:
-        word = st.session_state.current_word
-        st.markdown("---")
-        feedback = render_word_details(word, audio_manager)
-        if feedback is not None:
-            engine.update_word_mastery(word, feedback)
-            storage.save_progress(st.session_state.profile, st.session_state.all_words)
-            st.success("Progress saved!")
-            time.sleep(0.5)
-            st.rerun()
+    render_word_grid(story, story_idx, audio_manager, engine)
 
     st.markdown("---")
     st.markdown("### 🧠 Smart Review (Spaced Repetition)")
@@ -822,22 +1206,11 @@ def main():
         st.success("🎉 No words due for review! Keep learning new words.")
 
     st.markdown("---")
-    with st.expander("📚 Browse All Words"):
-        search = st.text_input("Search words...")
-        filtered_words = [w for w in st.session_state.all_words if not search or search.lower() in w.english.lower() or search.lower() in w.hindi.lower()]
-        for i, word in enumerate(sorted(filtered_words, key=lambda w: w.english)):
-            col1, col2, col3, col4 = st.columns([2, 2, 1, 2])
-            with col1: st.markdown(f"**{word.english}** {word.image_hint}")
-            with col2: st.markdown(f"*{word.hindi}*")
-            with col3: st.markdown(f"{int(word.mastery_level * 100)}%")
-            with col4:
-                audio_bytes = audio_manager.generate_audio(word.english)
-                if audio_bytes:
-                    audio_manager.create_audio_player(audio_bytes, word.english, f"browse_{i}")
+    render_browse_all(st.session_state.all_words_sorted, audio_manager)
 
     st.markdown("---")
     if st.button("💾 Save All Progress", use_container_width=True):
-        storage.save_progress(st.session_state.profile, st.session_state.all_words)
+        storage.save_progress(st.session_state.profile, list(st.session_state.all_words_index.values()))
         st.success("✅ Progress saved successfully!")
         st.session_state.profile.last_session = datetime.now()
         st.session_state.profile.streak_days = engine.calculate_streak(st.session_state.profile)